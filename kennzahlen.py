@@ -1,36 +1,102 @@
+import asyncio
+import base64
+import importlib.util
 import io
 import re
 from datetime import datetime
+from html import escape
 from typing import Dict, List, Tuple
 
+import numpy as np
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 
 # -----------------------------
 # Optional PDF Export (WeasyPrint)
 # -----------------------------
-WEASYPRINT_OK = False
-try:
-    from weasyprint import HTML  # type: ignore
-    WEASYPRINT_OK = True
-except Exception:
-    WEASYPRINT_OK = False
+# Nur prüfen, ob installiert - der teure Import passiert erst, wenn ein PDF angefordert wird
+WEASYPRINT_OK = importlib.util.find_spec("weasyprint") is not None
+
+# -----------------------------
+# Optional schneller Excel-Reader (calamine, Rust)
+# -----------------------------
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
 
 
 # -----------------------------
 # HTML Helper
 # -----------------------------
-def fig_to_html(fig) -> str:
-    # Plotly Chart als HTML-Fragment (mit CDN PlotlyJS)
-    return fig.to_html(full_html=False, include_plotlyjs="cdn")
+def plotlyjs_cdn_url() -> str:
+    # PlotlyJS passend zur installierten plotly-Version, wird nur einmal im <head> geladen
+    from plotly.offline import get_plotlyjs_version
+    return f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+
+def fig_to_html(fig, div_id: str) -> str:
+    # Plotly Chart als HTML-Fragment: Figure-JSON einmal serialisieren, ohne eigenes PlotlyJS
+    # Wie fig.to_html: Div füllt den Container, Chart skaliert mit dem Fenster (responsive)
+    return (
+        f'<div id="{div_id}" class="plotly-graph-div" style="height:100%; width:100%;"></div>'
+        f'<script>{{ const fig = {fig.to_json()};'
+        f' Plotly.newPlot("{div_id}", fig.data, fig.layout, {{"responsive": true}}); }}</script>'
+    )
+
+
+class ChartExportError(RuntimeError):
+    # Statischer Chart-Export (kaleido/Chrome) fehlgeschlagen - ein solches Ergebnis darf nicht gecacht werden
+    pass
+
+
+PDF_CHART_PLACEHOLDER = '<div class="sub">Grafik im PDF nicht verfügbar (statischer Export fehlgeschlagen).</div>'
+
+
+def figs_to_img_html(figs: List[object]) -> List[str]:
+    # Statische PNGs (kaleido) für den PDF-Export - WeasyPrint führt kein JavaScript aus.
+    # Alle Charts in EINER kaleido-Session (ein Chrome-Start statt einem je Chart).
+    # Scheitert der Export (kein Chrome, Timeout, ...), gibt es ChartExportError statt stiller Platzhalter.
+    if not figs:
+        return []
+
+    async def render() -> List[object]:
+        import kaleido  # type: ignore
+
+        async with kaleido.Kaleido(n=min(4, len(figs))) as k:
+            return await asyncio.gather(
+                *(k.calc_fig(fig.to_dict(), opts={"format": "png", "width": 900, "height": 400}) for fig in figs),
+                return_exceptions=True
+            )
+
+    try:
+        results = asyncio.run(render())
+    except Exception as e:
+        raise ChartExportError(f"kaleido: {e}") from e
+
+    failed = [img for img in results if not isinstance(img, bytes)]
+    if failed:
+        raise ChartExportError(f"{len(failed)} von {len(figs)} Grafiken: {failed[0]}")
+
+    return [
+        f'<img src="data:image/png;base64,{base64.b64encode(img).decode()}" style="width:100%;"/>'
+        for img in results
+    ]
+
+
+def df_to_html_table(df: pd.DataFrame) -> str:
+    # Schlanke HTML-Tabelle per join statt DataFrame.to_html (langsamer Formatter-Pfad)
+    head = "".join(f"<th>{escape(str(col))}</th>" for col in df.columns)
+    body = "\n".join(
+        "<tr>" + "".join(f"<td>{escape(val)}</td>" for val in row) + "</tr>"
+        for row in df.astype(str).itertuples(index=False, name=None)
+    )
+    return f"<table><thead><tr>{head}</tr></thead><tbody>\n{body}\n</tbody></table>"
 
 
 def build_html_report(
     title: str,
     kpis: Dict[str, str],
     charts_html: List[Tuple[str, str]],
-    table_df: pd.DataFrame
+    table_df: pd.DataFrame,
+    for_pdf: bool = False
 ) -> str:
     css = """
     :root{--bg:#0f1115;--card:#171a21;--muted:#aab2c0;--text:#f2f4f8;--accent:#4aa3ff;}
@@ -45,13 +111,22 @@ def build_html_report(
     .section{margin-top:18px;}
     .section h2{font-size:18px;margin:0 0 10px 0;}
     .chart{background:var(--card);border:1px solid rgba(255,255,255,.07);border-radius:14px;padding:10px;margin-bottom:12px;}
+    .pill{display:inline-block;padding:3px 8px;border-radius:999px;background:rgba(74,163,255,.15);border:1px solid rgba(74,163,255,.25);color:#cfe7ff;font-size:12px;}
+    @media (max-width:1000px){.grid{grid-template-columns:repeat(2,1fr);}}
+    @media (max-width:560px){.grid{grid-template-columns:1fr;}}
+    """
+    if for_pdf:
+        # PDF: schlichte Tabelle ohne Karten-Styling, das WeasyPrint nur Layoutzeit kostet
+        css += """
+    table{width:100%;border-collapse:collapse;}
+    th,td{padding:4px 6px;font-size:11px;text-align:left;}
+    """
+    else:
+        css += """
     table{width:100%;border-collapse:collapse;background:var(--card);border:1px solid rgba(255,255,255,.07);border-radius:14px;overflow:hidden;}
     th,td{padding:10px 10px;border-bottom:1px solid rgba(255,255,255,.06);font-size:13px;}
     th{color:var(--muted);text-align:left;font-weight:600;}
     tr:last-child td{border-bottom:none;}
-    .pill{display:inline-block;padding:3px 8px;border-radius:999px;background:rgba(74,163,255,.15);border:1px solid rgba(74,163,255,.25);color:#cfe7ff;font-size:12px;}
-    @media (max-width:1000px){.grid{grid-template-columns:repeat(2,1fr);}}
-    @media (max-width:560px){.grid{grid-template-columns:1fr;}}
     """
     now = datetime.now().strftime("%d.%m.%Y %H:%M")
 
@@ -73,11 +148,12 @@ def build_html_report(
         </div>
         """
 
-    preview_table = table_df.copy()
-    if len(preview_table) > 200:
-        preview_table = preview_table.head(200)
+    preview_table = table_df.head(200)
+
+    table_html = df_to_html_table(preview_table)
 
-    table_html = preview_table.to_html(index=False, escape=True)
+    # PlotlyJS nur einmal laden - und gar nicht, wenn kein JS ausgeführt wird (PDF)
+    plotly_script = "" if for_pdf else f'<script src="{plotlyjs_cdn_url()}"></script>'
 
     html = f"""
     <!doctype html>
@@ -87,6 +163,7 @@ def build_html_report(
       <meta name="viewport" content="width=device-width, initial-scale=1">
       <title>{title}</title>
       <style>{css}</style>
+      {plotly_script}
     </head>
     <body>
       <div class="wrap">
@@ -111,10 +188,169 @@ def build_html_report(
     return html
 
 
+# -----------------------------
+# Struktur-Parameter (deine Vorgabe)
+# -----------------------------
+DATE_COL = 0        # Spalte A
+HEADER_ROW = 1      # Zeile 2 (0-basiert)
+DATA_START = 2      # Ab Zeile 3
+
+# Optionale feste Sortierung
+WEEKDAY_ORDER = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+
+
+# -----------------------------
+# Daten-Helper (gecacht, Key = Datei-Bytes)
+# -----------------------------
+@st.cache_data(show_spinner=False)
+def load_workbook(file_bytes: bytes) -> Dict[str, pd.DataFrame]:
+    # Einlesen ohne Header, damit wir Zeile 2 als "Spaltennamen" manuell übernehmen können
+    xls = pd.ExcelFile(io.BytesIO(file_bytes), engine=EXCEL_ENGINE)
+    return {
+        sheet: pd.read_excel(xls, sheet_name=sheet, header=None)
+        for sheet in xls.sheet_names
+    }
+
+
+def find_metrics(df_raw: pd.DataFrame) -> Dict[int, str]:
+    # Auswertungsarten aus Zeile 2 übernehmen (ab Spalte B, leere Zellen überspringen)
+    if df_raw.shape[0] <= HEADER_ROW:
+        return {}
+    names = df_raw.iloc[HEADER_ROW, 1:].dropna().astype(str).str.strip()
+    names = names[names != ""]
+    return dict(zip(names.index, names))
+
+
+@st.cache_data(show_spinner=False)
+def build_long(file_bytes: bytes, sheet: str) -> pd.DataFrame:
+    # Long-Format bauen: Datum, Wochentag, Auswertungsart, Wert
+    df_raw = load_workbook(file_bytes)[sheet]
+    metrics = find_metrics(df_raw)
+
+    # Nur Datumsspalte + erkannte Auswertungsarten behalten (leere/trailing Spalten fallen weg)
+    df_raw = df_raw.iloc[:, [DATE_COL, *metrics.keys()]]
+
+    # Datum + Wochentag OHNE locale (Streamlit Cloud safe)
+    # Datumsspalte genau einmal parsen; ungültige Zeilen fallen raus, der Index bleibt erhalten
+    dates = pd.to_datetime(df_raw.iloc[DATA_START:, DATE_COL], errors="coerce")
+    dates = dates[dates.notna()]
+
+    # Werte numerisch (falls Excel als Text kommt); float32 reicht für die Kennzahlen.
+    # Zeilen über den df_raw-Index der gültigen Datumszeilen alignen.
+    values = df_raw.loc[dates.index, list(metrics.keys())].apply(pd.to_numeric, errors="coerce")
+    block = values.to_numpy(dtype="float32").T  # Zeilen = Auswertungsart, Spalten = Datumszeile
+
+    # Spaltenweise ohne Python-Records: Positionen aller belegten Zellen (je Auswertungsart nach Datum)
+    metric_pos, row_pos = np.nonzero(~np.isnan(block))
+    metric_codes, metric_names = pd.factorize(pd.Series(list(metrics.values())), sort=True)
+
+    # Kategorien statt object -> groupby läuft über Integer-Codes (0=Mo ... 6=So)
+    return pd.DataFrame({
+        "Datum": dates.to_numpy()[row_pos],
+        "Wochentag": pd.Categorical.from_codes(
+            dates.dt.weekday.to_numpy()[row_pos], categories=WEEKDAY_ORDER, ordered=True
+        ),
+        "Auswertungsart": pd.Categorical.from_codes(
+            metric_codes[metric_pos], categories=metric_names
+        ).remove_unused_categories(),
+        "Wert": block[metric_pos, row_pos],
+    })
+
+
+# -----------------------------
+# Chart Helper
+# -----------------------------
+def build_metric_fig(agg_all: pd.DataFrame, metric: str):
+    # Balkendiagramm einer Auswertungsart aus der vorab aggregierten Wochentags-Tabelle
+    import plotly.express as px  # erst hier laden, nicht beim Kaltstart
+
+    agg = agg_all.loc[metric].dropna().rename("Wert").reset_index()
+    return px.bar(
+        agg,
+        x="Wochentag",
+        y="Wert",
+        title=f"{metric} pro Wochentag (Summe)",
+        labels={"Wert": metric}
+    )
+
+
+def build_figures(filtered: pd.DataFrame, sel_metrics: List[str]) -> List[Tuple[str, object]]:
+    # Alle Auswertungsarten in einem Durchlauf summieren (Zeilen = Auswertungsart, Spalten = Wochentag)
+    agg_all = (
+        filtered.groupby(["Auswertungsart", "Wochentag"], observed=True)["Wert"]
+        .sum()
+        .unstack("Wochentag")
+        .reindex(columns=WEEKDAY_ORDER)
+    )
+
+    return [
+        (metric, build_metric_fig(agg_all, metric))
+        for metric in sel_metrics
+        if metric in agg_all.index
+    ]
+
+
+# -----------------------------
+# Report (gecacht je Datei, Blatt und Auswahl)
+# -----------------------------
+REPORT_TITLE = "Kennzahlenauswertung – Datum & Auswertungsart"
+
+
+def compute_kpis(long_df: pd.DataFrame) -> Dict[str, str]:
+    return {
+        "Zeitraum Start": long_df["Datum"].min().strftime("%d.%m.%Y"),
+        "Zeitraum Ende": long_df["Datum"].max().strftime("%d.%m.%Y"),
+        "Auswertungsarten": str(len(long_df["Auswertungsart"].cat.categories)),
+        "Datenpunkte": str(len(long_df)),
+    }
+
+
+def render_report(
+    file_bytes: bytes,
+    sheet: str,
+    selected: Tuple[str, ...],
+    pdf: bool = False,
+    pdf_charts: bool = True
+) -> bytes:
+    long_df = build_long(file_bytes, sheet)
+    filtered = long_df[long_df["Auswertungsart"].isin(selected)]
+    figs = build_figures(filtered, list(selected))
+
+    # PDF: statische PNGs (eine kaleido-Session für alle), HTML: interaktive Plotly-Charts
+    if pdf and pdf_charts:
+        charts = figs_to_img_html([fig for _, fig in figs])
+    elif pdf:
+        charts = [PDF_CHART_PLACEHOLDER] * len(figs)
+    else:
+        charts = [fig_to_html(fig, f"chart-{i}") for i, (_, fig) in enumerate(figs)]
+    charts_html: List[Tuple[str, str]] = [
+        (f"{metric} pro Wochentag (Summe)", chart) for (metric, _), chart in zip(figs, charts)
+    ]
+
+    html_report = build_html_report(
+        title=REPORT_TITLE,
+        kpis=compute_kpis(long_df),
+        charts_html=charts_html,
+        table_df=filtered,
+        for_pdf=pdf
+    )
+    if pdf:
+        from weasyprint import HTML  # type: ignore
+        return HTML(string=html_report).write_pdf()
+    return html_report.encode("utf-8")
+
+
+@st.cache_data(show_spinner=False)
+def build_report(file_bytes: bytes, sheet: str, selected: Tuple[str, ...], pdf: bool = False) -> bytes:
+    # Rerun durch Download-Klick/Checkbox baut den Report nicht neu, solange Datei + Auswahl gleich sind.
+    # Exceptions (z.B. ChartExportError) werden von st.cache_data nicht gespeichert.
+    return render_report(file_bytes, sheet, selected, pdf=pdf)
+
+
 # -----------------------------
 # Streamlit UI
 # -----------------------------
-st.set_page_config(page_title="Kennzahlenauswertung – Datum & Auswertungsart", layout="wide")
+st.set_page_config(page_title=REPORT_TITLE, layout="wide")
 st.title("📊 Kennzahlenauswertung (Excel → Streamlit → HTML/PDF)")
 
 with st.sidebar:
@@ -140,55 +376,14 @@ if not excel_bytes:
     st.info("Bitte Excel hochladen oder lokalen Pfad angeben.")
     st.stop()
 
-xls = pd.ExcelFile(io.BytesIO(excel_bytes))
-sheet = st.selectbox("Tabellenblatt wählen", xls.sheet_names, index=0)
-
-# Einlesen ohne Header, damit wir Zeile 2 als "Spaltennamen" manuell übernehmen können
-df_raw = pd.read_excel(io.BytesIO(excel_bytes), sheet_name=sheet, header=None)
+workbook = load_workbook(excel_bytes)
+sheet = st.selectbox("Tabellenblatt wählen", list(workbook.keys()), index=0)
+df_raw = workbook[sheet]
 
 st.write("### Rohdaten-Vorschau")
 st.dataframe(df_raw.head(20), use_container_width=True)
 
-# -----------------------------
-# Struktur-Parameter (deine Vorgabe)
-# -----------------------------
-DATE_COL = 0        # Spalte A
-HEADER_ROW = 1      # Zeile 2 (0-basiert)
-DATA_START = 2      # Ab Zeile 3
-
-# -----------------------------
-# Datum + Wochentag OHNE locale (Streamlit Cloud safe)
-# -----------------------------
-df_dates = pd.DataFrame()
-df_dates["Datum"] = pd.to_datetime(df_raw.iloc[DATA_START:, DATE_COL], errors="coerce")
-df_dates = df_dates[df_dates["Datum"].notna()].copy()
-
-# 0=Mo ... 6=So
-wd = df_dates["Datum"].dt.weekday
-df_dates["Wochentag"] = wd.map({0: "Mo", 1: "Di", 2: "Mi", 3: "Do", 4: "Fr", 5: "Sa", 6: "So"})
-
-# Optionale feste Sortierung
-weekday_order = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
-df_dates["Wochentag"] = pd.Categorical(df_dates["Wochentag"], categories=weekday_order, ordered=True)
-
-# Wir müssen die Wertezeilen passend zu den gültigen Datumszeilen alignen:
-# df_raw Datenbereich ab DATA_START, aber df_dates hat evtl. Zeilen mit ungültigem Datum entfernt.
-# Daher merken wir uns die Original-Indizes:
-valid_idx = df_raw.iloc[DATA_START:, DATE_COL].index[pd.to_datetime(df_raw.iloc[DATA_START:, DATE_COL], errors="coerce").notna()]
-
-# -----------------------------
-# Auswertungsarten aus Zeile 2 übernehmen
-# -----------------------------
-metrics: Dict[int, str] = {}
-for col in range(1, df_raw.shape[1]):  # ab Spalte B
-    name = df_raw.iloc[HEADER_ROW, col]
-    if pd.isna(name):
-        continue
-    metric_name = str(name).strip()
-    if metric_name == "":
-        continue
-    metrics[col] = metric_name
-
+metrics = find_metrics(df_raw)
 if not metrics:
     st.error("Keine Auswertungsarten in Zeile 2 gefunden (Spalten B..?).")
     st.stop()
@@ -196,86 +391,41 @@ if not metrics:
 st.write("### Erkannte Auswertungsarten (aus Zeile 2)")
 st.write(list(metrics.values()))
 
-# -----------------------------
-# Long-Format bauen: Datum, Wochentag, Auswertungsart, Wert
-# -----------------------------
-records = []
-for col_idx, metric_name in metrics.items():
-    values = df_raw.loc[valid_idx, col_idx]  # nur Zeilen mit gültigem Datum
-    for i, val in values.items():
-        if pd.isna(val):
-            continue
-        # Datum/Wochentag zu diesem Index holen
-        # Position in df_dates über valid_idx
-        pos = list(valid_idx).index(i)
-        records.append({
-            "Datum": df_dates.iloc[pos]["Datum"],
-            "Wochentag": df_dates.iloc[pos]["Wochentag"],
-            "Auswertungsart": metric_name,
-            "Wert": val
-        })
-
-long_df = pd.DataFrame(records)
+long_df = build_long(excel_bytes, sheet)
 if long_df.empty:
     st.error("Keine Werte gefunden (alles leer/NaN?)")
     st.stop()
 
-# Werte numerisch (falls Excel als Text kommt)
-long_df["Wert"] = pd.to_numeric(long_df["Wert"], errors="coerce")
-long_df = long_df[long_df["Wert"].notna()].copy()
-
 # -----------------------------
 # KPIs
 # -----------------------------
 st.subheader("Kennzahlen")
-c1, c2, c3, c4 = st.columns(4)
-
-c1.metric("Zeitraum Start", long_df["Datum"].min().strftime("%d.%m.%Y"))
-c2.metric("Zeitraum Ende", long_df["Datum"].max().strftime("%d.%m.%Y"))
-c3.metric("Auswertungsarten", str(long_df["Auswertungsart"].nunique()))
-c4.metric("Datenpunkte", str(len(long_df)))
+for col, (label, val) in zip(st.columns(4), compute_kpis(long_df).items()):
+    col.metric(label, val)
 
 # -----------------------------
 # Filter
 # -----------------------------
 st.subheader("Filter")
+# Kategorien sind bereits sortiert und enthalten nur vorkommende Auswertungsarten (kein Scan über long_df)
+metric_options = long_df["Auswertungsart"].cat.categories.tolist()
 sel_metrics = st.multiselect(
     "Auswertungsarten auswählen",
-    options=sorted(long_df["Auswertungsart"].unique().tolist()),
-    default=sorted(long_df["Auswertungsart"].unique().tolist())
+    options=metric_options,
+    default=metric_options
 )
 
-filtered = long_df[long_df["Auswertungsart"].isin(sel_metrics)].copy()
+filtered = long_df[long_df["Auswertungsart"].isin(sel_metrics)]
 
 # -----------------------------
 # Grafiken je Auswertungsart
 # -----------------------------
 st.subheader("Grafische Auswertung nach Wochentag (Summe)")
 
-figs: List[Tuple[str, object]] = []
-
-for metric in sel_metrics:
-    sub = filtered[filtered["Auswertungsart"] == metric].copy()
-    if sub.empty:
-        continue
-
-    agg = (
-        sub.groupby("Wochentag")["Wert"]
-        .sum()
-        .reindex(weekday_order)
-        .dropna()
-        .reset_index()
-    )
+figs = build_figures(filtered, sel_metrics)
 
-    fig = px.bar(
-        agg,
-        x="Wochentag",
-        y="Wert",
-        title=f"{metric} pro Wochentag (Summe)",
-        labels={"Wert": metric}
-    )
+for metric, fig in figs:
     st.plotly_chart(fig, use_container_width=True)
-    figs.append((metric, fig))
 
 if show_detail_table:
     st.subheader("Detailtabelle (Long-Format)")
@@ -286,43 +436,43 @@ if show_detail_table:
 # -----------------------------
 st.subheader("📄 Export")
 
-kpis = {
-    "Zeitraum Start": long_df["Datum"].min().strftime("%d.%m.%Y"),
-    "Zeitraum Ende": long_df["Datum"].max().strftime("%d.%m.%Y"),
-    "Auswertungsarten": str(long_df["Auswertungsart"].nunique()),
-    "Datenpunkte": str(len(long_df)),
-}
-
-charts_html: List[Tuple[str, str]] = []
-for metric, fig in figs:
-    charts_html.append((f"{metric} pro Wochentag (Summe)", fig_to_html(fig)))
-
-html_report = build_html_report(
-    title="Kennzahlenauswertung – Datum & Auswertungsart",
-    kpis=kpis,
-    charts_html=charts_html,
-    table_df=filtered
-)
-
 st.download_button(
     "⬇️ HTML-Report herunterladen",
-    data=html_report.encode("utf-8"),
+    data=build_report(excel_bytes, sheet, tuple(sel_metrics)),
     file_name="kennzahlenauswertung.html",
     mime="text/html"
 )
 
 if WEASYPRINT_OK:
-    try:
-        pdf_bytes = HTML(string=html_report).write_pdf()
-        st.download_button(
-            "⬇️ PDF-Report herunterladen",
-            data=pdf_bytes,
-            file_name="kennzahlenauswertung.pdf",
-            mime="application/pdf"
-        )
-        st.success("PDF-Export bereit (WeasyPrint).")
-    except Exception as e:
-        st.error(f"PDF-Export fehlgeschlagen: {e}")
+    # PDF nur auf Wunsch bauen: WeasyPrint-Import, kaleido/Chrome und Layout kosten pro Auswahl spürbar Zeit
+    if st.checkbox("PDF-Report erzeugen", value=False):
+        try:
+            with st.spinner("PDF wird erzeugt ..."):
+                try:
+                    pdf_bytes = build_report(excel_bytes, sheet, tuple(sel_metrics), pdf=True)
+                    pdf_status = "PDF-Export bereit (WeasyPrint)."
+                except ChartExportError as e:
+                    # Fallback nur mit KPIs + Tabelle - bewusst ungecacht, der nächste Rerun versucht den Export erneut
+                    st.warning(
+                        "Grafiken konnten nicht als Bild exportiert werden, das PDF enthält nur KPIs und Tabelle.\n\n"
+                        f"Details: {e}"
+                    )
+                    pdf_bytes = render_report(excel_bytes, sheet, tuple(sel_metrics), pdf=True, pdf_charts=False)
+                    pdf_status = "PDF-Export bereit (ohne Grafiken)."
+            st.download_button(
+                "⬇️ PDF-Report herunterladen",
+                data=pdf_bytes,
+                file_name="kennzahlenauswertung.pdf",
+                mime="application/pdf"
+            )
+            st.success(pdf_status)
+        except (ImportError, OSError) as e:
+            st.warning(
+                "WeasyPrint ist installiert, lässt sich aber nicht laden (System-Abhängigkeiten wie Pango fehlen?).\n\n"
+                f"Details: {e}"
+            )
+        except Exception as e:
+            st.error(f"PDF-Export fehlgeschlagen: {e}")
 else:
     st.warning(
         "PDF-Export ist deaktiviert, weil WeasyPrint nicht installiert ist.\n\n"